@@ -1,10 +1,19 @@
 import logging
 import os
+import json
+import hashlib
+import itertools
+import threading
 import re
-import base64
+import socket
+import time
+import httpx
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from requests.adapters import HTTPAdapter
 from datetime import datetime
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, retry_if_exception
 
 # Configure logging
 logging.basicConfig(
@@ -24,15 +33,113 @@ LOGIN_DATA = {
 }
 GITHUB_TOKEN = os.environ.get("PERSONAL_ACCESS_TOKEN")
 REPO_NAME = os.environ.get("REPO_NAME", "DataDeltas/qcAuto")  # Fixed: proper env var with default
+BRANCH_NAME = os.environ.get("BRANCH_NAME") or None  # None means the repository's default branch
 POST_IDS_FILE = "postIds.txt"
 PROCESSED_FILE = "processed_so_far.txt"
+CACHE_DIR = os.environ.get("CACHE_DIR", os.path.expanduser("~/.cache/autocms"))
 USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
+API_HEADERS = {
+    "accept": "*/*",
+    "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
+    "user-agent": USER_AGENT,
+    "connection": "keep-alive",
+    "x-requested-with": "XMLHttpRequest"
+}
+# Matches a whole line holding one UUID, ignoring surrounding whitespace (but not newlines)
+_UUID_LINE_RE = re.compile(
+    r'^[^\S\n]*([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})[^\S\n]*$',
+    re.IGNORECASE | re.MULTILINE
+)
+# Every other separator str.splitlines() breaks on, mapped to \n so the regex sees the same lines
+_LINE_BREAKS = str.maketrans(dict.fromkeys("\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029", "\n"))
+
+def _find_ids(content):
+    """Return the UUIDs that sit alone on a line of content, in file order."""
+    return _UUID_LINE_RE.findall(content.translate(_LINE_BREAKS))
+
+def _git_blob_sha(data):
+    """Return the git blob SHA GitHub reports for a file with these bytes."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+GITHUB_MAX_WAIT = 120  # seconds; longer rate-limit waits would outlast the workflow timeout
+
+def _github_rate_limit_delay(response):
+    """Return the seconds GitHub asks us to wait before the next request, or None."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return max(float(retry_after), 1.0)
+    reset = response.headers.get("X-RateLimit-Reset")
+    if response.headers.get("X-RateLimit-Remaining") == "0" and reset and reset.isdigit():
+        return max(int(reset) - time.time(), 1.0)
+    return None
+
+class GitHubRateLimitError(httpx.HTTPError):
+    """Raised instead of sending a request while GitHub's rate limit is exhausted for too long."""
+
+def _should_retry_github(exc):
+    """Retry GitHub errors unless the rate-limit wait is too long to be worth it."""
+    if not isinstance(exc, httpx.HTTPError) or isinstance(exc, GitHubRateLimitError):
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        delay = _github_rate_limit_delay(exc.response)
+        if delay is not None and delay > GITHUB_MAX_WAIT:
+            logger.error(f"GitHub rate limit resets in {delay:.0f}s, not retrying")
+            return False
+    return True
+
+_default_github_wait = wait_exponential(multiplier=1, min=4, max=10)
+
+def wait_for_github(retry_state):
+    """Wait as long as GitHub's rate-limit headers ask, else back off exponentially."""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, httpx.HTTPStatusError):
+        delay = _github_rate_limit_delay(exc.response)
+        if delay is not None:
+            return delay
+    return _default_github_wait(retry_state)
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTP adapter that disables Nagle's algorithm and enables TCP keep-alive."""
+
+    socket_options = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.socket_options
+        return super().init_poolmanager(*args, **kwargs)
 
 class PostProcessor:
     def __init__(self):
         """Initialize processor and validate environment variables."""
         self.session = None
+        self._login_lock = threading.Lock()
+        self._run_ts = None
+        self._gh_resume_at = 0.0
+        self._cache_entries = {}
+        self._branch = None
+        self._remote_shas = {}
+        self.gh = httpx.Client(
+            http2=True,
+            headers={
+                "Authorization": f"token {GITHUB_TOKEN}",
+                "Accept": "application/vnd.github.v3+json",
+                "User-Agent": USER_AGENT
+            },
+            timeout=10.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+            event_hooks={
+                "request": [self._wait_for_github_rate_limit],
+                "response": [self._record_github_rate_limit]
+            }
+        )
         self.processed_ids = set()
+        self.processed_ids_frozen = frozenset()
+        self._processed_sha = None
+        self._processed_content = ""
         self.all_post_ids = []
         # Validate required environment variables
         required_vars = ["ROOBTECH_EMAIL", "ROOBTECH_PASSWORD", "PERSONAL_ACCESS_TOKEN", "LOGIN_URL", "API_URL", "PROJECT_ID"]
@@ -40,6 +147,8 @@ class PostProcessor:
         if missing_vars:
             logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
+        # The project part of the PostChecked form body is the same for every post
+        self._project_form = urlencode({"projectId": PROJECT_ID})
 
     @retry(
         stop=stop_after_attempt(3),
@@ -48,128 +157,267 @@ class PostProcessor:
     )
     def login(self):
         """Login to get session cookies."""
-        self.session = requests.Session()
+        # Only publish the session once it is logged in, so batch workers never pick up a half-built one
+        session = requests.Session()
+        session.mount("https://", KeepAliveAdapter(pool_connections=1, pool_maxsize=8))
         headers = {"User-Agent": USER_AGENT}
-        response = self.session.post(LOGIN_URL, data=LOGIN_DATA, headers=headers, timeout=10)
+        response = session.post(LOGIN_URL, data=LOGIN_DATA, headers=headers, timeout=10)
         response.raise_for_status()
         if "Login" not in response.url:
+            self.session = session
             logger.info("Login successful")
             return True
         logger.error(f"Login failed - Status: {response.status_code}, URL: {response.url}")
         return False
 
+    def _is_github_rate_limited(self, response):
+        """Return True if GitHub rejected the response because of a rate limit."""
+        return response.status_code == 429 or (
+            response.status_code == 403 and _github_rate_limit_delay(response) is not None
+        )
+
+    def _record_github_rate_limit(self, response):
+        """Remember when GitHub will accept requests again once the quota is used up."""
+        delay = _github_rate_limit_delay(response)
+        if delay is not None:
+            self._gh_resume_at = time.time() + delay
+
+    def _wait_for_github_rate_limit(self, request):
+        """Sleep before sending a request that GitHub would reject for rate limiting."""
+        delay = self._gh_resume_at - time.time()
+        if delay > GITHUB_MAX_WAIT:
+            logger.error(f"GitHub rate limit resets in {delay:.0f}s, not sending {request.method} {request.url.path}")
+            raise GitHubRateLimitError(f"GitHub rate limit resets in {delay:.0f}s")
+        if delay > 0:
+            logger.warning(f"GitHub rate limit reached, waiting {delay:.0f}s before {request.method} {request.url.path}")
+            time.sleep(delay)
+
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((requests.RequestException, requests.HTTPError))
+        wait=wait_for_github,
+        retry=retry_if_exception(_should_retry_github)
     )
     def download_file_from_github(self, filename):
         """Download file content from GitHub repository."""
         url = f"https://api.github.com/repos/{REPO_NAME}/contents/{filename}"
-        headers = {
-            "Authorization": f"token {GITHUB_TOKEN}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            content = response.json()
-            file_content = base64.b64decode(content['content']).decode('utf-8')
-            sha = content['sha']
+        cached = self._read_cache(filename)
+        if cached and cached["sha"] and self._remote_shas.get(filename) == cached["sha"]:
+            logger.info(f"{filename} matches the cached SHA, skipping download")
+            return cached["content"], cached["sha"]
+        headers = {"Accept": "application/vnd.github.v3.raw"}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        response = self.gh.get(url, headers=headers, params={"ref": self._branch})
+        if response.status_code == 304 and cached:
+            logger.info(f"{filename} unchanged on GitHub, using cached copy")
+            return cached["content"], cached["sha"]
+        elif response.status_code == 200:
+            # Raw media type returns the file body directly; the blob SHA needed
+            # for later updates is the git object hash of those bytes
+            raw = response.content
+            file_content = raw.decode('utf-8')
+            sha = _git_blob_sha(raw)
             logger.info(f"Downloaded {filename} from GitHub")
+            if response.headers.get("ETag"):
+                self._write_cache(filename, {"etag": response.headers["ETag"], "sha": sha, "content": file_content})
             return file_content, sha
         elif response.status_code == 404:
             logger.info(f"{filename} not found, will create new")
             return "", None
-        elif response.status_code == 429:
+        elif self._is_github_rate_limited(response):
             logger.warning("GitHub API rate limit exceeded")
-            raise requests.HTTPError("Rate limit exceeded")
+            raise httpx.HTTPStatusError("Rate limit exceeded", request=response.request, response=response)
         else:
             logger.error(f"Failed to download {filename}: {response.status_code} - {response.text[:200]}")
-            raise requests.HTTPError(f"Failed to download {filename}")
+            raise httpx.HTTPStatusError(f"Failed to download {filename}", request=response.request, response=response)
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((requests.RequestException, requests.HTTPError))
-    )
-    def upload_file_to_github(self, filename, content, sha=None):
-        """Upload file to GitHub repository."""
-        url = f"https://api.github.com/repos/{REPO_NAME}/contents/{filename}"
-        headers = {
-            "Authorization": f"token {GITHUB_TOKEN}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
-        data = {
-            "message": f"Update {filename} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            "content": encoded_content
-        }
-        if sha:
-            data["sha"] = sha
-        response = requests.put(url, json=data, headers=headers, timeout=10)
+    def _cache_path(self, filename):
+        return os.path.join(CACHE_DIR, f"{filename}.cache")
+
+    def _read_cache(self, filename):
+        """Return the cached {etag, sha, content[, ids]} for a GitHub file, or None."""
+        if filename in self._cache_entries:
+            return self._cache_entries[filename]
+        cached = None
+        try:
+            with open(self._cache_path(filename), encoding='utf-8') as f:
+                cached = json.load(f)
+            if not (isinstance(cached, dict) and isinstance(cached.get("content"), str) and "sha" in cached):
+                cached = None
+        except (OSError, ValueError):
+            pass
+        self._cache_entries[filename] = cached
+        return cached
+
+    def _write_cache(self, filename, entry):
+        """Persist a GitHub file's cache entry so later runs can revalidate it by SHA or ETag."""
+        self._cache_entries[filename] = entry
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(self._cache_path(filename), 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+        except OSError as e:
+            logger.warning(f"Could not write cache for {filename}: {e}")
+
+    def _parse_ids(self, filename, content, sha):
+        """Return the valid IDs in a file, reusing the cached parse if the SHA is unchanged."""
+        cached = self._read_cache(filename)
+        if cached and cached.get("sha") == sha and isinstance(cached.get("ids"), list):
+            return cached["ids"]
+        ids = _find_ids(content)
+        if cached and cached.get("sha") == sha:
+            self._write_cache(filename, dict(cached, ids=ids))
+        return ids
+
+    def _check_github_response(self, response, action):
+        """Return the JSON body of a successful GitHub response, raising otherwise."""
         if response.status_code in [200, 201]:
-            new_sha = response.json()['content']['sha']
-            logger.info(f"Uploaded {filename} to GitHub")
-            return new_sha
-        elif response.status_code == 429:
+            return response.json()
+        elif self._is_github_rate_limited(response):
             logger.warning("GitHub API rate limit exceeded")
-            raise requests.HTTPError("Rate limit exceeded")
+            raise httpx.HTTPStatusError("Rate limit exceeded", request=response.request, response=response)
         else:
-            logger.error(f"Failed to upload {filename}: {response.status_code} - {response.text[:200]}")
-            raise requests.HTTPError(f"Failed to upload {filename}")
+            logger.error(f"Failed to {action}: {response.status_code} - {response.text[:200]}")
+            raise httpx.HTTPStatusError(f"Failed to {action}", request=response.request, response=response)
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_for_github,
+        retry=retry_if_exception(_should_retry_github)
+    )
+    def fetch_remote_shas(self):
+        """Record the blob SHA of every top-level file on the branch in one tree request."""
+        tree = self._check_github_response(
+            self.gh.get(f"https://api.github.com/repos/{REPO_NAME}/git/trees/{self._branch}"),
+            f"read tree of {self._branch}"
+        )
+        self._remote_shas = {entry['path']: entry['sha'] for entry in tree['tree'] if entry['type'] == 'blob'}
+        return self._remote_shas
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_for_github,
+        retry=retry_if_exception(_should_retry_github)
+    )
+    def resolve_branch(self):
+        """Set the branch to read and commit on: BRANCH_NAME, or the repository's default branch."""
+        self._branch = BRANCH_NAME or self._check_github_response(
+            self.gh.get(f"https://api.github.com/repos/{REPO_NAME}"), f"read {REPO_NAME} metadata"
+        )['default_branch']
+        logger.info(f"Using branch: {self._branch}")
+        return self._branch
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_for_github,
+        retry=retry_if_exception(_should_retry_github)
+    )
+    def commit_files(self, changes, expected_shas=None, timestamp=None):
+        """Commit {path: content} changes to GitHub as a single commit via the Git Data API.
+
+        If expected_shas ({path: blob SHA or None}) is given, the commit is only made when
+        those top-level files still match. timestamp is used in the commit message (defaults
+        to now). Returns {path: new blob SHA}, or None on conflict.
+        """
+        api_url = f"https://api.github.com/repos/{REPO_NAME}/git"
+        branch = self._branch
+        paths = ', '.join(changes)
+        timestamp = timestamp or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        ref = self._check_github_response(
+            self.gh.get(f"{api_url}/ref/heads/{branch}"),
+            f"read {branch} ref"
+        )
+        head_sha = ref['object']['sha']
+        base_tree = self._check_github_response(
+            self.gh.get(f"{api_url}/trees/{head_sha}"),
+            f"read tree of {head_sha}"
+        )
+
+        current_shas = {entry['path']: entry['sha'] for entry in base_tree['tree']}
+        new_shas = {path: _git_blob_sha(content.encode('utf-8')) for path, content in changes.items()}
+        if all(current_shas.get(path) == sha for path, sha in new_shas.items()):
+            # Nothing to change, e.g. a retry after the ref update succeeded but its response was lost
+            logger.info(f"{paths} already up to date on GitHub")
+            return new_shas
+
+        if expected_shas:
+            stale = [path for path, sha in expected_shas.items() if current_shas.get(path) != sha]
+            if stale:
+                logger.warning(f"Conflict committing {paths}: {', '.join(stale)} changed since it was downloaded")
+                return None
+
+        tree = self._check_github_response(
+            self.gh.post(f"{api_url}/trees", json={
+                "base_tree": base_tree['sha'],
+                "tree": [
+                    {"path": path, "mode": "100644", "type": "blob", "content": content}
+                    for path, content in changes.items()
+                ]
+            }),
+            f"create tree for {paths}"
+        )
+        commit = self._check_github_response(
+            self.gh.post(f"{api_url}/commits", json={
+                "message": f"Update {paths} - {timestamp}",
+                "tree": tree['sha'],
+                "parents": [head_sha]
+            }),
+            f"create commit for {paths}"
+        )
+
+        response = self.gh.patch(f"{api_url}/refs/heads/{branch}", json={"sha": commit['sha']})
+        if response.status_code == 422:
+            logger.warning(f"Conflict committing {paths}: {branch} moved while committing")
+            return None
+        self._check_github_response(response, f"update {branch} ref")
+
+        logger.info(f"Committed {paths} to GitHub")
+        return {entry['path']: entry['sha'] for entry in tree['tree'] if entry['path'] in changes}
 
     def load_processed_ids(self):
         """Load already processed IDs from GitHub."""
         logger.info("Loading processed IDs from GitHub...")
-        content, _ = self.download_file_from_github(PROCESSED_FILE)
+        content, self._processed_sha = self.download_file_from_github(PROCESSED_FILE)
+        self._processed_content = content
         if content and content.strip():
-            self.processed_ids = set(
-                line.strip() for line in content.split('\n')
-                if line.strip() and self.is_valid_id(line.strip())
-            )
+            self.processed_ids = set(self._parse_ids(PROCESSED_FILE, content, self._processed_sha))
             logger.info(f"Loaded {len(self.processed_ids)} processed IDs")
         else:
             self.processed_ids = set()
             logger.info("No processed IDs found, starting fresh")
+        self.processed_ids_frozen = frozenset(self.processed_ids)
 
     def load_post_ids(self):
         """Load post IDs from GitHub."""
         logger.info("Loading post IDs from GitHub...")
-        content, _ = self.download_file_from_github(POST_IDS_FILE)
+        content, sha = self.download_file_from_github(POST_IDS_FILE)
         if content and content.strip():
-            self.all_post_ids = [
-                line.strip() for line in content.split('\n')
-                if line.strip() and self.is_valid_id(line.strip())
-            ]
+            self.all_post_ids = self._parse_ids(POST_IDS_FILE, content, sha)
             logger.info(f"Loaded {len(self.all_post_ids)} post IDs")
         else:
             logger.error("Could not load post IDs from GitHub")
             self.all_post_ids = []
 
-    def is_valid_id(self, post_id):
-        """Validate post ID as a UUID."""
-        uuid_pattern = r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
-        return bool(re.match(uuid_pattern, post_id, re.IGNORECASE))
-
     def get_unprocessed_batch(self):
-        """Get the next sequential batch of 3-4 unprocessed post IDs from the beginning."""
-        unprocessed = []
-        
-        # Go through all_post_ids in order and find unprocessed ones
+        """Get the next sequential batch of up to 8 unprocessed post IDs from the beginning."""
+        batch_size = 8
+        batch = []
+
+        # Go through all_post_ids in order and stop as soon as the batch is full
+        processed_ids = self.processed_ids_frozen
         for post_id in self.all_post_ids:
-            if post_id not in self.processed_ids:
-                unprocessed.append(post_id)
-        
+            if post_id not in processed_ids:
+                batch.append(post_id)
+                if len(batch) >= batch_size:
+                    break
+
         logger.info(f"Progress: {len(self.processed_ids)}/{len(self.all_post_ids)} posts processed")
-        logger.info(f"Remaining: {len(unprocessed)} posts")
-        
-        if not unprocessed:
+        logger.info(f"Remaining: ~{max(len(self.all_post_ids) - len(self.processed_ids), len(batch))} posts")
+
+        if not batch:
             return []
-        
-        # Take the first 3-4 unprocessed IDs (sequential from beginning)
-        batch_size = min(8, len(unprocessed))  # Take up to 4 IDs, or all remaining if less than 4
-        
-        batch = unprocessed[:batch_size]
+
         logger.info(f"Selected sequential batch of {len(batch)} IDs from beginning: {batch}")
         return batch
 
@@ -180,30 +428,26 @@ class PostProcessor:
     )
     def process_post(self, post_id):
         """Process a single post with the given ID."""
-        headers = {
-            "accept": "*/*",
-            "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "user-agent": USER_AGENT,
-            "x-requested-with": "XMLHttpRequest"
-        }
-        data = {
-            "postId": post_id,
-            "projectId": PROJECT_ID
-        }
-        response = self.session.post(API_URL, data=data, headers=headers, timeout=10)
-        if response.status_code == 200:
-            logger.info(f"Successfully processed post ID: {post_id}")
-            return True
-        elif response.status_code in [401, 403] or "Login" in response.url:
-            logger.warning(f"Session expired while processing {post_id}, attempting to re-authenticate")
-            if self.login():
-                return self.process_post(post_id)  # Retry after re-authentication
-            else:
-                logger.error("Re-authentication failed")
+        # Post IDs are validated UUIDs, so they need no URL escaping
+        data = f"postId={post_id}&{self._project_form}"
+        for attempt in range(2):
+            session = self.session
+            response = session.post(API_URL, data=data, headers=API_HEADERS, timeout=10)
+            if response.status_code == 200:
+                logger.info(f"Successfully processed post ID: {post_id}")
+                return True
+            elif response.status_code not in [401, 403] and "Login" not in response.url:
+                logger.error(f"Failed to process post ID {post_id}: {response.status_code} - {response.text[:100]}")
                 return False
-        else:
-            logger.error(f"Failed to process post ID {post_id}: {response.status_code} - {response.text[:100]}")
-            return False
+            elif attempt == 0:
+                logger.warning(f"Session expired while processing {post_id}, attempting to re-authenticate")
+                with self._login_lock:
+                    # Another worker may already have replaced the expired session
+                    if self.session is session and not self.login():
+                        logger.error("Re-authentication failed")
+                        return False
+        logger.error(f"Session still rejected after re-authentication while processing {post_id}")
+        return False
 
     def process_batch(self, post_ids):
         """Process a batch of post IDs."""
@@ -212,11 +456,19 @@ class PostProcessor:
         
         logger.info(f"Processing batch of {len(post_ids)} posts...")
         
-        for post_id in post_ids:
-            if self.process_post(post_id):
-                successful_ids.append(post_id)
-            else:
-                failed_ids.append(post_id)
+        # Overlap up to two requests so each post's round-trip doesn't block the next
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [(post_id, executor.submit(self.process_post, post_id)) for post_id in post_ids]
+            for post_id, future in futures:
+                try:
+                    succeeded = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing post ID {post_id}: {e}")
+                    succeeded = False
+                if succeeded:
+                    successful_ids.append(post_id)
+                else:
+                    failed_ids.append(post_id)
         
         logger.info(f"Batch processing completed: {len(successful_ids)} successful, {len(failed_ids)} failed")
         
@@ -229,33 +481,61 @@ class PostProcessor:
         """Save multiple processed IDs to GitHub."""
         # Add to local set
         self.processed_ids.update(post_ids)
-        
-        # Download current file
-        content, sha = self.download_file_from_github(PROCESSED_FILE)
-        processed_list = [line.strip() for line in content.split('\n') if line.strip()] if content.strip() else []
-        
-        # Add new IDs that aren't already in the list
-        for post_id in post_ids:
-            if post_id not in processed_list:
-                processed_list.append(post_id)
-        
-        # Upload updated list
-        all_processed = '\n'.join(processed_list)
-        return self.upload_file_to_github(PROCESSED_FILE, all_processed, sha)
+
+        # Reuse the content and SHA from load_processed_ids instead of downloading again
+        known_ids = self.processed_ids_frozen
+        processed_content, new_ids = self._merge_processed_ids(self._processed_content, known_ids, post_ids)
+        new_shas = self.commit_files(
+            {PROCESSED_FILE: processed_content}, {PROCESSED_FILE: self._processed_sha}, self._run_ts
+        )
+        if new_shas is None:
+            # The file changed since it was loaded, merge against the latest copy once.
+            # Forget the startup SHA so the download can't be served from the stale cache.
+            self._remote_shas.pop(PROCESSED_FILE, None)
+            content, sha = self.download_file_from_github(PROCESSED_FILE)
+            known_ids = set(_find_ids(content))
+            processed_content, new_ids = self._merge_processed_ids(content, known_ids, post_ids)
+            new_shas = self.commit_files({PROCESSED_FILE: processed_content}, {PROCESSED_FILE: sha}, self._run_ts)
+
+        if not new_shas:
+            return None
+        self._processed_content = processed_content
+        self._processed_sha = new_shas[PROCESSED_FILE]
+        self.processed_ids_frozen = frozenset(self.processed_ids)
+        # Cache what was just committed so the next run can skip the download when the SHA still matches
+        self._write_cache(PROCESSED_FILE, {
+            "etag": None,
+            "sha": self._processed_sha,
+            "content": processed_content,
+            "ids": list(itertools.chain(known_ids, new_ids))
+        })
+        return self._processed_sha
+
+    def _merge_processed_ids(self, content, known_ids, post_ids):
+        """Return the file content with the post IDs not in known_ids appended, and those new IDs."""
+        new_ids = [post_id for post_id in dict.fromkeys(post_ids) if post_id not in known_ids]
+        existing = [content.rstrip()] if content.strip() else []
+        return '\n'.join(itertools.chain(existing, new_ids)), new_ids
 
     def run(self):
         """Main processing logic."""
-        logger.info(f"Starting Sequential Post Processor at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self._run_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        logger.info(f"Starting Sequential Post Processor at {self._run_ts}")
         logger.info(f"Using GitHub repo: {REPO_NAME}")
+        self.resolve_branch()
+        self.fetch_remote_shas()
 
         # Login
         if not self.login():
             logger.error("Cannot proceed without login")
             return False
 
-        # Load data from GitHub
-        self.load_processed_ids()
-        self.load_post_ids()
+        # Load data from GitHub (the two downloads are independent, so run them concurrently)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            processed_future = executor.submit(self.load_processed_ids)
+            post_ids_future = executor.submit(self.load_post_ids)
+            processed_future.result()
+            post_ids_future.result()
 
         # Get a batch of unprocessed post IDs (sequential from beginning)
         post_ids_batch = self.get_unprocessed_batch()